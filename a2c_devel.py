@@ -221,7 +221,7 @@ def train(config):
     for frame_idx in range(1, config.MAX_FRAMES+1):
         for step in range(config.rollout):
             
-            with torch.no_grad():
+            with torch.inference_mode():
                 values, actions, action_log_prob, states = model.get_action(
                                                             model.config.rollouts.observations[step],
                                                             model.config.rollouts.states[step],
@@ -266,7 +266,7 @@ def train(config):
 
             model.config.rollouts.insert(obs, states, actions.view(-1, 1), action_log_prob, values, rewards, masks)
             
-        with torch.no_grad():
+        with torch.inference_mode():
             next_value = model.get_values(model.config.rollouts.observations[-1],
                                 model.config.rollouts.states[-1],
                                 model.config.rollouts.masks[-1])
@@ -344,7 +344,7 @@ def test(config):
     tstep=0
     while not done:
         tstep+=1
-        with torch.no_grad():
+        with torch.inference_mode():
                 value, action, action_log_prob, state = model.get_action(obs, state, mask)
             
         cpu_action = action.view(-1).cpu().numpy()
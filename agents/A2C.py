@@ -51,33 +51,30 @@ class Model(BaseAgent):
         
 
     def get_action(self, s, states, masks, deterministic=False):
-        logits, values, states = self.model(s, states, masks)
-        dist = torch.distributions.Categorical(logits=logits)
+        logits, values, states = self.model.forward_step(s, states, masks)
+        log_probs = F.log_softmax(logits, dim=1)
 
         if deterministic:
-            actions = dist.probs.argmax(dim=1, keepdim=True)
+            actions = log_probs.argmax(dim=1, keepdim=True)
         else:
-            actions = dist.sample().view(-1, 1)
+            actions = torch.multinomial(log_probs.exp(), 1)
 
-        log_probs = F.log_softmax(logits, dim=1)
         action_log_probs = log_probs.gather(1, actions)
 
         return values, actions, action_log_probs, states
 
     def evaluate_actions(self, s, actions, states, masks):
-        logits, values, states = self.model(s, states, masks)
-
-        dist = torch.distributions.Categorical(logits=logits)
+        logits, values, states = self.model.forward_seq(s, states, masks)
 
         log_probs = F.log_softmax(logits, dim=1)
         action_log_probs = log_probs.gather(1, actions)
 
-        dist_entropy = dist.entropy().mean()
+        dist_entropy = -(log_probs.exp() * log_probs).sum(dim=1).mean()
 
         return values, action_log_probs, dist_entropy, states
 
     def get_values(self, s, states, masks):
-        _, values, _ = self.model(s, states, masks)
+        _, values, _ = self.model.forward_step(s, states, masks)
 
         return values
 
@@ -53,8 +53,9 @@ class Model(A2C_Model):
     def declare_networks(self):
         self.model = ActorCriticSMB(self.num_feats, self.num_actions, self.config.recurrent_policy_grad, self.config.gru_size)
         self.ICMfeaturizer = IC_Features(self.num_feats)
-        self.ICMForwardModel = IC_ForwardModel_Head(self.ICMfeaturizer.feature_size(), self.num_actions, self.ICMfeaturizer.feature_size())
-        self.ICMBackwardModel = IC_InverseModel_Head(self.ICMfeaturizer.feature_size()*2, self.num_actions)        
+        feature_size = self.ICMfeaturizer.feature_size()
+        self.ICMForwardModel = IC_ForwardModel_Head(feature_size, self.num_actions, feature_size)
+        self.ICMBackwardModel = IC_InverseModel_Head(feature_size*2, self.num_actions)        
 
     def icm_get_features(self, s):
         return self.ICMfeaturizer(s)
@@ -84,18 +85,18 @@ class Model(A2C_Model):
           end=start+minibatch_size
           
           #compute intrinsic reward
-          with torch.no_grad():
+          with torch.inference_mode():
             phi = self.icm_get_features(rollout.observations.view(-1, *obs_shape)[start:end+self.config.num_agents])
           
-            icm_obs_pred = self.icm_get_forward_outp(phi[:-1*self.config.num_agents], rollout.actions.view(-1, 1)[start:end])
+            icm_obs_pred = self.icm_get_forward_outp(phi[:-self.config.num_agents], rollout.actions.view(-1, 1)[start:end])
             obs_diff = icm_obs_pred - phi[self.config.num_agents:]
             print(obs_diff.pow(2).sqrt().sum(dim=1))
             #intr_reward = torch.sin(obs_diff.pow(2).sqrt().sum(dim=1))
             #if obs_diff.mean()>0:
-            intr_reward = self.config.icm_prediction_beta/(obs_diff.pow(2).sqrt().sum(dim=1))
+            intr_reward = self.config.icm_prediction_beta/(obs_diff.pow(2).sqrt().sum(dim=1, keepdim=True))
             #else:
             #    intr_reward = obs_diff.pow(2).sqrt().sum(dim=1)*self.config.icm_prediction_beta
-            all_intr_reward[start:end] = intr_reward.view(-1, 1)
+            all_intr_reward[start:end] = intr_reward
         
         rollout.rewards += all_intr_reward.view(num_steps, num_processes, 1)
         rollout.rewards = torch.clamp(rollout.rewards, min=-1.0, max=1.0)
@@ -121,7 +122,7 @@ class Model(A2C_Model):
           phi = self.icm_get_features(rollout.observations.view(-1, *obs_shape)[start:end+self.config.num_agents])
           tmp = rollout.observations[1,0]==rollout.observations.view(-1, *obs_shape)[self.config.num_agents]
           
-          icm_obs_pred = self.icm_get_forward_outp(phi[:-1*self.config.num_agents], rollout.actions.view(-1, 1)[start:end])
+          icm_obs_pred = self.icm_get_forward_outp(phi[:-self.config.num_agents], rollout.actions.view(-1, 1)[start:end])
           
           #forward model loss
           obs_diff = icm_obs_pred - phi[self.config.num_agents:]
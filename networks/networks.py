@@ -34,8 +34,10 @@ class ActorCriticSMB(nn.Module):
         #c4_out = self.conv4(c3_out)
         #self.layernorm_conv4 = nn.LayerNorm(c4_out.size()[1:])
 
+        feature_size = self.feature_size(input_shape)
+
         if use_gru:
-            self.gru = nn.GRUCell(self.feature_size(input_shape), self.gru_size)
+            self.gru = nn.GRUCell(feature_size, self.gru_size)
             nn.init.orthogonal_(self.gru.weight_ih.data)
             nn.init.orthogonal_(self.gru.weight_hh.data)
             self.gru.bias_ih.data.fill_(0)
@@ -44,7 +46,7 @@ class ActorCriticSMB(nn.Module):
             init_ = lambda m: self.layer_init(m, nn.init.orthogonal_,
                         lambda x: nn.init.constant_(x, 0),
                         nn.init.calculate_gain('relu'))
-            self.fc1 = init_(nn.Linear(self.feature_size(input_shape), self.gru_size))
+            self.fc1 = init_(nn.Linear(feature_size, self.gru_size))
 
         init_ = lambda m: self.layer_init(m, nn.init.orthogonal_,
                     lambda x: nn.init.constant_(x, 0), gain=1)
@@ -55,10 +57,78 @@ class ActorCriticSMB(nn.Module):
                     lambda x: nn.init.constant_(x, 0), gain=0.01)
 
         self.actor_linear = init_(nn.Linear(self.gru_size, num_actions))
+
+        # NHWC convolutions map onto tensor cores on recent GPUs
+        self.to(memory_format=torch.channels_last)
         
         self.train()
 
     def forward(self, inputs, states, masks):
+        if inputs.size(0) == states.size(0):
+            return self.forward_step(inputs, states, masks)
+        else:
+            return self.forward_seq(inputs, states, masks)
+
+    def forward_step(self, inputs, states, masks):
+        # a single step for N workers: inputs is (N, ...), states is (N, -1)
+        x = self.conv_features(inputs)
+
+        if self.use_gru:
+            x = states = self.gru(x, states * masks)
+        else:
+            x = F.relu(self.fc1(x), inplace=True)
+
+        return self.head_only(x, states)
+
+    def forward_seq(self, inputs, states, masks):
+        # T steps for N workers: inputs is (T * N, ...), states is the (N, -1)
+        # state at the first step
+        x = self.conv_features(inputs)
+
+        if self.use_gru:
+            # x is a (T, N, -1) tensor that has been flatten to (T * N, -1)
+            N = states.size(0)
+            T = int(x.size(0) / N)
+
+            # unflatten
+            x = x.view(T, N, x.size(1))
+
+            # Same deal with masks
+            masks = masks.view(T, N, 1)
+
+            # Steps where any worker's episode restarted. In between, the
+            # masks are all ones, so the hidden state only needs resetting
+            # at the start of each stretch and the whole stretch can go
+            # through the multi-step GRU kernel in one call
+            has_zeros = ((masks[1:, :, 0] == 0.0).any(dim=1).nonzero().view(-1) + 1).tolist()
+            has_zeros = [0] + has_zeros + [T]
+
+            # the GRUCell parameters in nn.GRU's flat weight order
+            gru_weights = [self.gru.weight_ih, self.gru.weight_hh, self.gru.bias_ih, self.gru.bias_hh]
+
+            states = states.unsqueeze(0)
+            outputs = []
+            for start, end in zip(has_zeros[:-1], has_zeros[1:]):
+                hx, states = torch.gru(x[start:end], states * masks[start].view(1, N, 1),
+                    gru_weights, True, 1, 0.0, self.training, False, False)
+                outputs.append(hx)
+            states = states.squeeze(0)
+
+            # assert sum(len(hx) for hx in outputs) == T
+            # x is a (T, N, -1) tensor. A rollout without restarts is a
+            # single stretch whose output is already contiguous, so skip
+            # the copy into a fresh tensor
+            x = outputs[0] if len(outputs) == 1 else torch.cat(outputs, dim=0)
+            # flatten
+            x = x.view(T * N, -1)
+        else:
+            x = F.relu(self.fc1(x), inplace=True)
+
+        return self.head_only(x, states)
+
+    def conv_features(self, inputs):
+        inputs = inputs.contiguous(memory_format=torch.channels_last)
+
         #x = self.dropout2d(inputs)
         x = F.relu(self.conv1(inputs))
         #x = self.layernorm_conv1(x)
@@ -75,38 +145,11 @@ class ActorCriticSMB(nn.Module):
         x = F.relu(self.conv4(x))
         #x = self.layernorm_conv4(x)
 
-        return self.head_only(x, inputs, states, masks)
-
-    def head_only(self, x, inputs, states, masks):
-        if self.use_gru:
-            x = x.view(x.size(0), -1)
-            if inputs.size(0) == states.size(0):
-                x = states = self.gru(x, states * masks)
-            else:
-                # x is a (T, N, -1) tensor that has been flatten to (T * N, -1)
-                N = states.size(0)
-                T = int(x.size(0) / N)
-
-                # unflatten
-                x = x.view(T, N, x.size(1))
-
-                # Same deal with masks
-                masks = masks.view(T, N, 1)
-
-                outputs = []
-                for i in range(T):
-                    hx = states = self.gru(x[i], states*masks[i])     
-                    outputs.append(hx)
-
-                # assert len(outputs) == T
-                # x is a (T, N, -1) tensor
-                x = torch.stack(outputs, dim=0)
-                # flatten
-                x = x.view(T * N, -1)
-        else:
-            x = x.view(x.size(0), -1)
-            x = F.relu(self.fc1(x))
+        # conv features are channels_last, so flattening copies them back
+        # into NCHW order
+        return x.reshape(x.size(0), -1)
 
+    def head_only(self, x, states):
         value = self.critic_linear(x)
         logits = self.actor_linear(x)
 
@@ -119,7 +162,7 @@ class ActorCriticSMB(nn.Module):
         return module
 
     def feature_size(self, input_shape):
-        return self.conv4(self.conv3(self.conv2(self.conv1(torch.zeros(1, *input_shape))))).view(1, -1).size(1)
+        return self.conv4(self.conv3(self.conv2(self.conv1(torch.zeros(1, *input_shape, device='meta'))))).view(1, -1).size(1)
     
     @property
     def state_size(self):
@@ -34,7 +34,7 @@ class IC_Features(nn.Module):
         return x
 
     def feature_size(self):
-        return self.conv4(self.conv3(self.conv2(self.conv1(torch.zeros(1, *self.input_shape))))).view(1, -1).size(1)
+        return self.conv4(self.conv3(self.conv2(self.conv1(torch.zeros(1, *self.input_shape, device='meta'))))).view(1, -1).size(1)
 
 class IC_InverseModel_Head(nn.Module):
     def __init__(self, input_shape, num_actions):
@@ -47,7 +47,7 @@ class IC_InverseModel_Head(nn.Module):
         self.fc2 = nn.Linear(256, self.num_actions)
         
     def forward(self, x):
-        x = F.relu(self.fc1(x))
+        x = F.relu(self.fc1(x), inplace=True)
         logits = self.fc2(x)
 
         return logits
@@ -66,7 +66,7 @@ class IC_ForwardModel_Head(nn.Module):
         a_onehot = make_one_hot(a, self.num_actions)
         x = torch.cat((phi.detach(), a_onehot), dim=1)
 
-        x = F.relu(self.fc1(x))
+        x = F.relu(self.fc1(x), inplace=True)
         x = self.fc2(x)
 
         return x
\ No newline at end of file